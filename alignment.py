@@ -0,0 +1,166 @@
+"""Cross-market session alignment: which US close feeds which NSE open.
+
+A US session dated `u` closes around 01:30-02:30 IST on `u + 1`, so it is
+news for the first NSE session dated strictly after `u`. SessionAlignment keeps,
+for every cue ticker, its session dates, closes and the index of the NSE open
+each session feeds (`len(nse_dates)` = the next, not yet traded, open). It is
+built once and updated incrementally as new bars arrive, so the live change
+calculation and historical analysis are plain array lookups instead of
+per-ticker `dropna()` + `iloc[-1]/iloc[-2]`, which silently pairs the wrong days
+around holidays.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from providers import NSE_TICKERS
+
+
+def _cash_session(ticker):
+    # Futures (CL=F) and the ICE dollar index trade ~23h a day: their bar for
+    # day D exists before NSE opens on D, so it can't tell us the US cash
+    # session that feeds the next open has closed
+    return not ticker.endswith("=F") and ticker != "DX-Y.NYB"
+
+
+class SessionAlignment:
+    def __init__(self, anchor="^NSEI"):
+        self.anchor = anchor
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.nse_dates = np.array([], dtype="datetime64[ns]")
+        self.dates = {}    # ticker -> session dates (datetime64)
+        self.closes = {}   # ticker -> closes on those dates
+        self.targets = {}  # cue ticker -> index into nse_dates of the open it feeds
+        self._live_open = 0
+
+    # --- BUILD / UPDATE ---
+    def update(self, close_data):
+        """Fold a (dates x tickers) close frame into the index. Only new bars cost anything."""
+        with self._lock:
+            index = close_data.index.values.astype("datetime64[ns]")
+            if self.anchor in close_data:
+                self._extend_nse(index[close_data[self.anchor].notna().values])
+            for ticker in close_data.columns:
+                valid = close_data[ticker].notna().values
+                self._extend_ticker(ticker, index[valid], close_data[ticker].values[valid].astype(float))
+            # Once per update: latest() needs it for every ticker
+            self._live_open = self._find_live_open()
+        return self
+
+    def _extend_nse(self, dates):
+        if not len(dates):
+            return  # ^NSEI failed this download: keep what we have
+        if len(self.nse_dates) and dates[0] < self.nse_dates[0]:
+            self._reset()  # longer history than we hold: rebuild from scratch
+        new = dates[dates > self.nse_dates[-1]] if len(self.nse_dates) else dates
+        if not len(new):
+            return
+        old_len = len(self.nse_dates)
+        self.nse_dates = np.concatenate([self.nse_dates, new])
+        # Sessions that were waiting for the next open may now have one
+        for ticker, targets in self.targets.items():
+            pending = np.searchsorted(targets, old_len)
+            targets[pending:] = np.searchsorted(self.nse_dates, self.dates[ticker][pending:], side="right")
+
+    def _extend_ticker(self, ticker, dates, closes):
+        if not len(dates):
+            return
+        known = self.dates.get(ticker)
+        if known is None or dates[0] < known[0]:
+            start = 0
+            self.dates[ticker], self.closes[ticker] = dates[:0], closes[:0]
+            self.targets.pop(ticker, None)
+        else:
+            # The last stored bar may be a live one that has moved since: overwrite it
+            start = np.searchsorted(dates, known[-1])
+            if start < len(dates) and dates[start] == known[-1]:
+                self.closes[ticker][-1] = closes[start]
+                start += 1
+        if start == len(dates):
+            return
+        self.dates[ticker] = np.concatenate([self.dates[ticker], dates[start:]])
+        self.closes[ticker] = np.concatenate([self.closes[ticker], closes[start:]])
+        if ticker not in NSE_TICKERS:
+            new_targets = np.searchsorted(self.nse_dates, dates[start:], side="right")
+            self.targets[ticker] = np.concatenate([self.targets.get(ticker, new_targets[:0]), new_targets])
+
+    # --- LOOKUPS ---
+    def live_open(self):
+        """Index of the NSE open the dashboard is predicting (as of the last update)."""
+        return self._live_open
+
+    def _find_live_open(self):
+        """Index of the NSE open the dashboard is predicting.
+
+        Before the bell that is the next open (a US cash-session cue already
+        has a session waiting for it); once NSE has traded today it is today's
+        open. Round-the-clock futures only decide when they are all we have.
+        """
+        n = len(self.nse_dates)
+        cash = [t for ticker, t in self.targets.items() if _cash_session(ticker)] or self.targets.values()
+        if any(len(t) and t[-1] == n for t in cash):
+            return n
+        return max(n - 1, 0)
+
+    def close_before(self, ticker, open_idx):
+        """Last close of a cue ticker known before NSE open `open_idx` (vectorised over open_idx)."""
+        pos = np.searchsorted(self.targets[ticker], open_idx, side="right") - 1
+        return np.where(pos >= 0, self.closes[ticker][np.maximum(pos, 0)], np.nan)
+
+    def latest(self, ticker):
+        """(last close, % change that matters for the live open) for one ticker."""
+        closes = self.closes.get(ticker)
+        if closes is None or len(closes) < 2:
+            return None
+        last = closes[-1]
+        if ticker in NSE_TICKERS or not len(self.nse_dates):
+            prev = closes[-2]
+        else:
+            # Move since the last close the previous NSE open already priced in.
+            # Nothing new (US holiday) -> 0%; several sessions (NSE holiday) -> compounded.
+            live = self.live_open()
+            last = self.close_before(ticker, live)
+            prev = self.close_before(ticker, live - 1)
+            if np.isnan(prev):
+                return None
+        return float(last), float((last - prev) / prev * 100)
+
+    def cue_returns(self, cues, opens):
+        """(len(opens), len(cues)) % returns of each cue aligned to the given NSE opens; NaN if unknown."""
+        opens = np.asarray(opens)
+        returns = np.full((len(opens), len(cues)), np.nan)
+        for j, cue in enumerate(cues):
+            if cue in self.targets:
+                curr = self.close_before(cue, opens)
+                prev = self.close_before(cue, opens - 1)
+                returns[:, j] = (curr - prev) / prev * 100
+        return returns
+
+    def gaps(self, nifty_open, opens):
+        """Nifty opening gap in % (Open[k] / Close[k-1] - 1) at NSE opens k >= 1."""
+        opens = np.asarray(opens)
+        prev_close = self.closes[self.anchor][opens - 1]
+        open_px = nifty_open.reindex(pd.DatetimeIndex(self.nse_dates[opens])).values
+        return (open_px / prev_close - 1) * 100
+
+    def close_before_open(self, ticker, open_idx):
+        """Last close of an NSE-traded ticker (e.g. ^INDIAVIX) dated before NSE open `open_idx` (vectorised)."""
+        open_idx = np.asarray(open_idx)
+        dates = self.dates.get(ticker)
+        if dates is None or not len(self.nse_dates):
+            return np.full(open_idx.shape, np.nan)
+        # The not yet traded open comes after every close we hold
+        when = self.nse_dates[np.minimum(open_idx, len(self.nse_dates) - 1)]
+        pos = np.where(open_idx < len(self.nse_dates), np.searchsorted(dates, when), len(dates)) - 1
+        return np.where(pos >= 0, self.closes[ticker][np.maximum(pos, 0)], np.nan)
+
+    def overnight_returns(self):
+        """Cue returns aligned to each NSE open (rows = NSE sessions, % units). See latest() for the next open."""
+        opens = np.arange(len(self.nse_dates))
+        index = pd.DatetimeIndex(self.nse_dates, name="NSE Open")
+        cues = list(self.targets)
+        return pd.DataFrame(self.cue_returns(cues, opens), index=index, columns=cues)
@@ -1,7 +1,8 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 
+from providers import get_provider
+
 # --- APP CONFIGURATION ---
 st.set_page_config(page_title="Nifty Sentiment Tracker", page_icon="📈")
 
@@ -21,11 +22,11 @@ gift_nifty_input = st.sidebar.number_input(
 
 # --- FUNCTION TO FETCH DATA ---
 def get_market_data():
-    tickers = ["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI"]
+    tickers = get_provider().tickers(["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI"])
     
     # FIX 1: Increased period to "5d" to ensure we handle weekends/holidays safely
     try:
-        data = yf.download(tickers, period="5d", progress=False)
+        data = get_provider().download(tickers, period="5d")
         
         # Check if data is empty
         if data.empty:
@@ -1,7 +1,8 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 
+from providers import get_provider
+
 # --- APP CONFIGURATION ---
 st.set_page_config(page_title="Nifty Sentiment Pro", page_icon="📈", layout="wide")
 
@@ -12,11 +13,11 @@ page = st.sidebar.radio("Go to", ["Live Dashboard", "Logic & Explanation"])
 @st.cache_data(ttl=300) # Cache data for 5 mins to prevent constant reloading
 def get_market_data():
     # Added "CL=F" (Crude Oil) instead of BZ=F which is sometimes delayed
-    tickers = ["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI", "CL=F", "^TNX", "DX-Y.NYB", "QQQ"]
+    tickers = get_provider().tickers(["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI", "CL=F", "^TNX", "DX-Y.NYB", "QQQ"])
     
     try:
         # Fetch 7 days to ensure we definitely find valid trading days
-        data = yf.download(tickers, period="7d", progress=False)
+        data = get_provider().download(tickers, period="7d")
         
         if 'Close' in data:
             close_data = data['Close']
@@ -1,9 +1,10 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
+from alignment import SessionAlignment
+from providers import get_provider
+
 # --- APP CONFIGURATION ---
 st.set_page_config(page_title="Nifty Sentiment Auto", page_icon="🤖", layout="wide")
 
@@ -22,9 +23,9 @@ def scrape_gift_nifty():
     }
     
     try:
-        response = requests.get(url, headers=headers, timeout=5)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+        html = get_provider().get_page(url, headers=headers, timeout=5)
+        if html:
+            soup = BeautifulSoup(html, "html.parser")
             # Look for table rows containing "GIFT Nifty"
             for row in soup.find_all("tr"):
                 if "GIFT Nifty" in row.text:
@@ -44,13 +45,18 @@ def scrape_gift_nifty():
     
     return None
 
+# --- SESSION ALIGNMENT (one per server, updated with every download) ---
+@st.cache_resource
+def session_alignment():
+    return SessionAlignment()
+
 # --- FUNCTION 2: FETCH MARKET DATA ---
 @st.cache_data(ttl=300)
 def get_market_data():
     # Added "GC=F" (Gold) just for reference if needed, mainly using CL=F (Oil)
-    tickers = ["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI", "CL=F", "^TNX", "DX-Y.NYB", "QQQ"]
+    tickers = get_provider().tickers(["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI", "CL=F", "^TNX", "DX-Y.NYB", "QQQ"])
     try:
-        data = yf.download(tickers, period="7d", progress=False)
+        data = get_provider().download(tickers, period="7d")
         
         # Handle MultiIndex if strictly needed
         if 'Close' in data:
@@ -60,15 +66,18 @@ def get_market_data():
             
         changes = {}
         last_prices = {}
+        # Match each US cue to the NSE open it feeds (handles holidays on either side)
+        alignment = session_alignment()
+        try:
+            alignment.update(close_data)
+        except:
+            pass  # a bad download: keep the last good alignment
         
         for ticker in tickers:
             try:
-                # Get series and drop NaNs to find valid trading days
-                series = close_data[ticker].dropna()
-                if len(series) >= 2:
-                    curr = series.iloc[-1]
-                    prev = series.iloc[-2]
-                    change = ((curr - prev) / prev) * 100
+                latest = alignment.latest(ticker)
+                if latest:
+                    curr, change = latest
                     
                     changes[ticker] = round(change, 2)
                     last_prices[ticker] = round(curr, 2)
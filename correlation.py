@@ -0,0 +1,90 @@
+"""Rolling correlation and beta of each overnight cue against the Nifty opening gap.
+
+For every NSE session k the pair is (cue return aligned to open k, Nifty gap at
+open k = Open[k] / Close[k-1] - 1), both in %. The engine keeps running sums
+(n, Σx, Σy, Σx², Σy², Σxy) per window and per cue, so a new bar is one add and
+one subtract per cue per window: O(tickers) instead of O(tickers x window).
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class RollingCueStats:
+    def __init__(self, cues, windows=(20, 60, 120), anchor="^NSEI"):
+        self.cues = list(cues)
+        self.windows = tuple(windows)
+        self.anchor = anchor
+        self.last_date = None
+        self._lock = threading.Lock()
+        depth, n = max(self.windows), len(self.cues)
+        # Ring buffer of the last max(windows) bars, needed to subtract the bar leaving each window
+        self._ring_x = np.full((depth, n), np.nan)
+        self._ring_y = np.full(depth, np.nan)
+        self._pushed = 0
+        self._sums = {w: np.zeros((6, n)) for w in self.windows}  # rows: n, Σx, Σy, Σx², Σy², Σxy
+
+    @staticmethod
+    def _terms(x, y):
+        valid = np.isfinite(x) & np.isfinite(y)
+        x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+        return np.stack([valid.astype(float), x, y, x * x, y * y, x * y])
+
+    def push(self, x, y):
+        """Add one bar: x = cue returns (len(cues),), y = Nifty gap."""
+        x = np.asarray(x, dtype=float)
+        depth = len(self._ring_y)
+        incoming = self._terms(x, y)
+        for w, sums in self._sums.items():
+            sums += incoming
+            if self._pushed >= w:
+                slot = (self._pushed - w) % depth
+                sums -= self._terms(self._ring_x[slot], self._ring_y[slot])
+        slot = self._pushed % depth
+        self._ring_x[slot], self._ring_y[slot] = x, y
+        self._pushed += 1
+
+    def update(self, alignment, nifty_open):
+        """Push every NSE session newer than the last one seen. `nifty_open` is ^NSEI opens by date."""
+        with self._lock:
+            nse_dates = alignment.nse_dates
+            start = 1 if self.last_date is None else np.searchsorted(nse_dates, self.last_date, side="right")
+            start = max(start, 1)  # the first session has no previous close to gap from
+            if start >= len(nse_dates) or self.anchor not in alignment.closes:
+                return self
+            opens = np.arange(start, len(nse_dates))
+            gaps = alignment.gaps(nifty_open, opens)
+            returns = alignment.cue_returns(self.cues, opens)
+            for x, y in zip(returns, gaps):
+                self.push(x, y)
+            self.last_date = nse_dates[-1]
+        return self
+
+    # --- RESULTS (cues x windows) ---
+    def _moments(self, w):
+        n, sx, sy, sxx, syy, sxy = self._sums[w]
+        cov = n * sxy - sx * sy
+        var_x = np.maximum(n * sxx - sx * sx, 0)
+        var_y = np.maximum(n * syy - sy * sy, 0)
+        enough = n >= max(5, w // 2)  # half-empty windows are noise
+        return cov, var_x, var_y, enough
+
+    def correlation(self):
+        out = {}
+        with self._lock:  # push() changes the sums in place
+            for w in self.windows:
+                cov, var_x, var_y, enough = self._moments(w)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    out[f"{w}d"] = np.where(enough, cov / np.sqrt(var_x * var_y), np.nan)
+        return pd.DataFrame(out, index=pd.Index(self.cues, name="Cue"))
+
+    def beta(self):
+        """Nifty gap (%) per 1% move in the cue."""
+        out = {}
+        with self._lock:
+            for w in self.windows:
+                cov, var_x, _, enough = self._moments(w)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    out[f"{w}d"] = np.where(enough, cov / var_x, np.nan)
+        return pd.DataFrame(out, index=pd.Index(self.cues, name="Cue"))
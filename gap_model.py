@@ -0,0 +1,85 @@
+"""Nifty opening-gap model fed by overnight cues, updated one session at a time.
+
+A linear model gap% = w . [cue returns %, India VIX, 1] fitted by recursive
+least squares with a forgetting factor: every new NSE session is one rank-1
+update of the weights and the inverse covariance P (O(features²), no refit),
+and old sessions fade out so the weights follow the current regime. The live
+feature row is built once per update, so a prediction is a single dot product.
+"""
+import threading
+
+import numpy as np
+
+
+class GapModel:
+    def __init__(self, cues, vix="^INDIAVIX", forgetting=0.99, prior=100.0, anchor="^NSEI"):
+        self.cues = list(cues)
+        self.vix = vix
+        self.forgetting = forgetting
+        self.anchor = anchor
+        self.features = self.cues + [vix, "Intercept"]
+        k = len(self.features)
+        self.weights = np.zeros(k)
+        self.P = np.eye(k) * prior  # large prior variance: the first sessions move the weights a lot
+        self.sessions = 0
+        self.mse = np.nan           # forgetting-weighted squared error of predictions made before each session
+        self.last_date = None
+        self._live_x = None         # feature row of the live open, as of the last update
+        self._lock = threading.Lock()
+
+    def learn(self, x, y):
+        """One RLS step on feature row x (as built by features_at) and realised gap y."""
+        error = y - x @ self.weights
+        Px = self.P @ x
+        gain = Px / (self.forgetting + x @ Px)
+        # Rebind instead of mutating so a concurrent predict() sees old or new weights, never half of each
+        self.weights = self.weights + gain * error
+        self.P = (self.P - np.outer(gain, Px)) / self.forgetting
+        self.mse = error * error if np.isnan(self.mse) else self.forgetting * self.mse + (1 - self.forgetting) * error * error
+        self.sessions += 1
+
+    def features_at(self, alignment, opens):
+        """(len(opens), features) rows for the given NSE opens: cue returns, VIX going in, 1."""
+        opens = np.asarray(opens)
+        rows = np.ones((len(opens), len(self.features)))
+        rows[:, :len(self.cues)] = alignment.cue_returns(self.cues, opens)
+        rows[:, len(self.cues)] = alignment.close_before_open(self.vix, opens)
+        return rows
+
+    def update(self, alignment, nifty_open):
+        """Learn every NSE session newer than the last one seen, up to (not incl.) the live open."""
+        with self._lock:
+            nse_dates = alignment.nse_dates
+            if self.anchor not in alignment.closes:
+                return self
+            start = 1 if self.last_date is None else np.searchsorted(nse_dates, self.last_date, side="right")
+            start = max(start, 1)  # the first session has no previous close to gap from
+            # The live open is what we predict; it is learned once the next session exists
+            stop = min(alignment.live_open(), len(nse_dates))
+            if start < stop:
+                opens = np.arange(start, stop)
+                rows = self.features_at(alignment, opens)
+                gaps = alignment.gaps(nifty_open, opens)
+                for x, y in zip(rows, gaps):
+                    if np.isfinite(x).all() and np.isfinite(y):
+                        self.learn(x, y)
+                self.last_date = nse_dates[stop - 1]
+            # Cues for the live open can move without a new session to learn
+            x = self.features_at(alignment, [alignment.live_open()])[0]
+            # No VIX level going in: no prediction. A cue with no data counts as a flat night
+            self._live_x = None if np.isnan(x[len(self.cues)]) else np.nan_to_num(x)
+        return self
+
+    def predict(self, x):
+        """Predicted gap % for one complete feature row: one dot product."""
+        return float(x @ self.weights)
+
+    def predict_live(self):
+        """Predicted gap % for the live open as of the last update, or None before the model has seen enough sessions."""
+        x = self._live_x
+        if x is None or self.sessions < 2 * len(self.features):
+            return None
+        return self.predict(x)
+
+    def rmse(self):
+        return float(np.sqrt(self.mse))
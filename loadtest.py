@@ -0,0 +1,356 @@
+"""Load-test harness for the Nifty dashboards.
+
+Runs master.py / automated.py as simulated Streamlit sessions against local
+stand-ins for Yahoo Finance and the moneycontrol global-indices page, then
+reports render latency percentiles, upstream call counts and memory growth.
+
+Usage:
+    python loadtest.py master.py automated.py --sessions 1,10,50 --yahoo-latency 0.3 --failure-rate 0.05
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+import pandas as pd
+import requests
+import streamlit as st
+import yfinance as yf
+from streamlit.logger import set_log_level
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from providers import NSE_TICKERS, SyntheticProvider, get_provider
+
+# --- FAKE UPSTREAM PAYLOADS ---
+MONEYCONTROL_HOST = "https://www.moneycontrol.com"
+SYNTHETIC = SyntheticProvider()
+
+
+def chart_payload(ticker, period):
+    # Same shape as query1.finance.yahoo.com/v8/finance/chart/<ticker>
+    hist = SYNTHETIC.download([ticker], period).xs(ticker, axis=1, level="Ticker").dropna()
+    close_hour = 10 if ticker in NSE_TICKERS else 20  # UTC close of NSE vs US sessions
+    stamps = [int((d + timedelta(hours=close_hour)).replace(tzinfo=timezone.utc).timestamp()) for d in hist.index]
+    quote_ = {
+        "open": hist["Open"].round(4).tolist(),
+        "high": hist[["Open", "Close"]].max(axis=1).round(4).tolist(),
+        "low": hist[["Open", "Close"]].min(axis=1).round(4).tolist(),
+        "close": hist["Close"].round(4).tolist(),
+        "volume": [1_000_000] * len(hist),
+    }
+    return {"chart": {"result": [{
+        "meta": {"symbol": ticker, "exchangeTimezoneName": "Asia/Kolkata" if ticker in NSE_TICKERS else "America/New_York"},
+        "timestamp": stamps,
+        "indicators": {"quote": [quote_], "adjclose": [{"adjclose": quote_["close"]}]},
+    }], "error": None}}
+
+
+# --- FAKE UPSTREAM SERVER ---
+class FakeUpstream:
+    """Local HTTP server standing in for Yahoo's chart API and moneycontrol."""
+
+    def __init__(self, yahoo_latency=0.0, scrape_latency=0.0, jitter=0.0, failure_rate=0.0, seed=0):
+        self.yahoo_latency = yahoo_latency
+        self.scrape_latency = scrape_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = Counter()
+        self.failures = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.startswith("/v8/finance/chart/"):
+                    kind, latency = "yahoo", upstream.yahoo_latency
+                elif url.path.startswith("/markets/global-indices"):
+                    kind, latency = "moneycontrol", upstream.scrape_latency
+                else:
+                    self.send_error(404)
+                    return
+                with upstream._lock:
+                    upstream.calls[kind] += 1
+                    delay = latency + upstream._rng.uniform(0, upstream.jitter)
+                    failed = upstream._rng.random() < upstream.failure_rate
+                time.sleep(delay)
+                if failed:
+                    with upstream._lock:
+                        upstream.failures[kind] += 1
+                    self.send_error(503)
+                    return
+                if kind == "yahoo":
+                    ticker = unquote(url.path.rsplit("/", 1)[-1])
+                    period = parse_qs(url.query).get("range", ["1y"])[0]
+                    body, ctype = json.dumps(chart_payload(ticker, period)).encode(), "application/json"
+                else:
+                    body, ctype = SYNTHETIC.get_page(self.path).encode(), "text/html"
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+            self.failures.clear()
+
+
+# --- ROUTING THE APPS TO THE FAKES ---
+def _fake_download(base_url):
+    # yfinance talks to hard-coded Yahoo hosts, so yf.download is swapped for a
+    # client that hits the fake chart endpoint and builds the same frame shape.
+    def download(tickers, period="1mo", interval="1d", progress=True, **kwargs):
+        if isinstance(tickers, str):
+            tickers = tickers.split()
+        frames = {}
+        for ticker in tickers:
+            try:
+                resp = _real_requests_get(f"{base_url}/v8/finance/chart/{quote(ticker, safe='')}",
+                                          params={"range": period, "interval": interval}, timeout=30)
+                resp.raise_for_status()
+                result = resp.json()["chart"]["result"][0]
+                q = result["indicators"]["quote"][0]
+                index = pd.to_datetime(result["timestamp"], unit="s").normalize()
+                frames[ticker] = pd.DataFrame({"Open": q["open"], "High": q["high"], "Low": q["low"],
+                                               "Close": q["close"], "Volume": q["volume"]}, index=index)
+            except Exception:
+                # yfinance logs failed tickers and leaves their columns empty
+                frames[ticker] = pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"], dtype=float)
+        data = pd.concat(frames, axis=1, sort=True).swaplevel(axis=1).sort_index(axis=1)
+        data.index.name = "Date"
+        data.columns.names = ["Price", "Ticker"]
+        return data
+    return download
+
+
+_real_requests_get = requests.get
+
+
+def _fake_requests_get(base_url):
+    def get(url, *args, **kwargs):
+        if url.startswith(MONEYCONTROL_HOST):
+            url = base_url + url[len(MONEYCONTROL_HOST):]
+        return _real_requests_get(url, *args, **kwargs)
+    return get
+
+
+@contextmanager
+def routed_to(upstream):
+    """Point yf.download / requests.get at a FakeUpstream for the duration of the block.
+
+    The apps are forced onto the live provider: with NIFTY_DATA_PROVIDER set to
+    synthetic / replay / record they would never reach the fake upstreams and
+    the report would show 0 upstream calls.
+    """
+    saved = yf.download, requests.get
+    saved_provider = os.environ.get("NIFTY_DATA_PROVIDER")
+    if saved_provider not in (None, "live"):
+        print(f"loadtest: ignoring NIFTY_DATA_PROVIDER={saved_provider}, using the live provider", file=sys.stderr)
+    os.environ["NIFTY_DATA_PROVIDER"] = "live"
+    get_provider.cache_clear()
+    yf.download = _fake_download(upstream.base_url)
+    requests.get = _fake_requests_get(upstream.base_url)
+    try:
+        yield upstream
+    finally:
+        yf.download, requests.get = saved
+        if saved_provider is None:
+            os.environ.pop("NIFTY_DATA_PROVIDER", None)
+        else:
+            os.environ["NIFTY_DATA_PROVIDER"] = saved_provider
+        get_provider.cache_clear()
+
+
+@contextmanager
+def shared_runtime():
+    """Let several AppTest sessions run at once.
+
+    AppTest installs a mock Runtime singleton for the length of each run and
+    resets it to None afterwards, so overlapping runs see "Runtime hasn't been
+    created!". Fall back to one shared mock whenever the slot is empty.
+    """
+    mock = MagicMock(spec=Runtime)
+    mock.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    mock.cache_storage_manager = MemoryCacheStorageManager()
+    saved = Runtime.__dict__["instance"], Runtime.__dict__["exists"]
+    Runtime.instance = classmethod(lambda cls: cls._instance or mock)
+    Runtime.exists = classmethod(lambda cls: True)
+    try:
+        yield
+    finally:
+        Runtime.instance, Runtime.exists = saved
+
+
+# --- SESSION DRIVER ---
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_session(script, reruns, timeout):
+    """One simulated browser session: initial render, then click through the sidebar pages."""
+    latencies, errors = [], 0
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+    for i in range(reruns):
+        start = time.perf_counter()
+        try:
+            if i > 0 and len(at.sidebar.radio):
+                nav = at.sidebar.radio[0]
+                nav.set_value(nav.options[i % len(nav.options)])
+            at.run()
+            if len(at.exception):
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return at, latencies, errors
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_step(script, sessions, upstream, reruns=3, timeout=60, cold=False, trace_memory=False):
+    """Drive `sessions` concurrent sessions of one script and return a result dict."""
+    if cold:
+        # The app singletons (alignment, indicator cache, ...) too, or "cold" is an incremental no-op
+        st.cache_data.clear()
+        st.cache_resource.clear()
+    upstream.reset_counts()
+    rss_before = _rss_bytes()
+    if trace_memory:
+        tracemalloc.start()
+    heap_before = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda _: run_session(script, reruns, timeout), range(sessions)))
+    wall = time.perf_counter() - wall
+
+    # Sessions are still referenced by `results`, so their state counts here.
+    heap_after = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    rss_after = _rss_bytes()
+    if trace_memory:
+        tracemalloc.stop()
+
+    latencies = [lat for _, lats, _ in results for lat in lats]
+    return {
+        "script": os.path.basename(script),
+        "sessions": sessions,
+        "renders": len(latencies),
+        "errors": sum(err for _, _, err in results),
+        "wall_s": round(wall, 3),
+        "renders_per_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        "yahoo_calls": upstream.calls["yahoo"],
+        "moneycontrol_calls": upstream.calls["moneycontrol"],
+        "upstream_failures": sum(upstream.failures.values()),
+        # Process-wide RSS growth (shared caches included) spread over the sessions: approximate
+        "approx_rss_per_session_kb": round((rss_after - rss_before) / sessions / 1024, 1),
+        "heap_per_session_kb": round((heap_after - heap_before) / sessions / 1024, 1) if trace_memory else "-",
+    }
+
+
+def print_table(rows):
+    cols = ["script", "sessions", "renders", "errors", "renders_per_s", "p50_ms", "p90_ms", "p99_ms",
+            "max_ms", "yahoo_calls", "moneycontrol_calls", "upstream_failures", "approx_rss_per_session_kb",
+            "heap_per_session_kb"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.rjust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).rjust(widths[c]) for c in cols))
+    print("\napprox_rss_per_session_kb: process-wide RSS growth over the step / sessions, shared caches included; "
+          "use --trace-memory for heap per session.")
+
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Nifty dashboards against local fake upstreams.")
+    parser.add_argument("scripts", nargs="*", default=["master.py", "automated.py"])
+    parser.add_argument("--sessions", default="1,5,20", help="comma-separated concurrency levels to step through")
+    parser.add_argument("--reruns", type=int, default=3, help="script runs per session (cycles sidebar pages)")
+    parser.add_argument("--yahoo-latency", type=float, default=0.2, help="seconds per fake chart request")
+    parser.add_argument("--scrape-latency", type=float, default=0.5, help="seconds per fake moneycontrol request")
+    parser.add_argument("--jitter", type=float, default=0.05, help="extra uniform random latency, seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of upstream requests answered 503")
+    parser.add_argument("--cold", action="store_true", help="clear st.cache_data and st.cache_resource before each step")
+    parser.add_argument("--trace-memory", action="store_true", help="measure Python heap per session (slower)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-render timeout, seconds")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = parser.parse_args(argv)
+
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    # Bare-mode warnings from every session thread would drown the report.
+    st.config.set_option("logger.level", "error")
+    set_log_level("error")
+    upstream = FakeUpstream(args.yahoo_latency, args.scrape_latency, args.jitter, args.failure_rate).start()
+    rows = []
+    try:
+        with routed_to(upstream), shared_runtime():
+            for script in args.scripts:
+                run_session(script, 1, args.timeout)  # warm-up: imports and bytecode only
+                st.cache_data.clear()
+                for n in levels:
+                    row = run_step(script, n, upstream, args.reruns, args.timeout, args.cold, args.trace_memory)
+                    rows.append(row)
+                    if args.json:
+                        print(json.dumps(row), flush=True)
+    finally:
+        upstream.stop()
+    if not args.json:
+        print_table(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,15 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 import numpy as np
+import altair as alt
+
+from alignment import SessionAlignment
+from correlation import RollingCueStats
+from gap_model import GapModel
+from profiling import finish_profiler, start_profiler_if_requested
+from providers import get_provider
+from timeframes import IndicatorCache
 
 # --- APP CONFIGURATION ---
 st.set_page_config(page_title="Nifty Master 4.0", page_icon="📈", layout="wide")
@@ -20,9 +26,9 @@ def scrape_gift_nifty():
         "Referer": "https://www.google.com/"
     }
     try:
-        response = requests.get(url, headers=headers, timeout=5)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+        html = get_provider().get_page(url, headers=headers, timeout=5)
+        if html:
+            soup = BeautifulSoup(html, "html.parser")
             for row in soup.find_all("tr"):
                 if "GIFT Nifty" in row.text:
                     for cell in row.find_all("td"):
@@ -33,14 +39,34 @@ def scrape_gift_nifty():
     except: pass
     return None
 
+# --- SESSION ALIGNMENT (one per server, updated with every download) ---
+@st.cache_resource
+def session_alignment():
+    return SessionAlignment()
+
+# --- CUE vs GAP CORRELATIONS (running sums, one new bar per day) ---
+@st.cache_resource
+def cue_stats():
+    return RollingCueStats(["INDA", "EWW", "HDB", "IBN", "INFY", "CL=F", "^TNX"], windows=(20, 60, 120))
+
+# --- GAP MODEL (recursive least squares, one update per new session) ---
+@st.cache_resource
+def gap_model():
+    return GapModel(["INDA", "HDB", "IBN", "INFY", "EWW", "CL=F", "^TNX"])
+
+# --- DAILY / WEEKLY / MONTHLY INDICATORS (one daily store, trailing bucket recomputed) ---
+@st.cache_resource
+def indicator_cache():
+    return IndicatorCache()
+
 # --- FUNCTION 2: FETCH DATA & CALCULATE TECHNICALS ---
 @st.cache_data(ttl=300)
 def get_market_data():
     # Added ^INDIAVIX for fear gauge
-    tickers = ["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI", "CL=F", "^TNX", "^INDIAVIX"]
+    tickers = get_provider().tickers(["INDA", "EWW", "HDB", "IBN", "INFY", "^NSEI", "CL=F", "^TNX", "^INDIAVIX"])
     
-    # We need 250 days for 200 SMA
-    data = yf.download(tickers, period="1y", progress=False)
+    # 2 years: 200 SMA on daily bars, RSI-14 on monthly bars
+    data = get_provider().download(tickers, period="2y")
     
     if 'Close' in data:
         close_data = data['Close']
@@ -49,37 +75,37 @@ def get_market_data():
         
     changes = {}
     last_prices = {}
-    technicals = {}
+    # US cues are measured against the NSE open they feed, not just their own last two rows
+    alignment = session_alignment()
+    try:
+        alignment.update(close_data)
+        if 'Open' in data and "^NSEI" in data['Open']:
+            cue_stats().update(alignment, data['Open']["^NSEI"])
+            gap_model().update(alignment, data['Open']["^NSEI"])
+    except:
+        pass  # a bad download: keep the last good alignment, tickers below fall back to 0%
 
     for ticker in tickers:
         try:
-            series = close_data[ticker].dropna()
-            if len(series) >= 2:
-                curr = series.iloc[-1]
-                prev = series.iloc[-2]
-                change = ((curr - prev) / prev) * 100
+            latest = alignment.latest(ticker)
+            if latest:
+                curr, change = latest
                 changes[ticker] = round(change, 2)
                 last_prices[ticker] = round(curr, 2)
-                
-                # --- CALCULATE RSI (14 Days) ---
-                delta = series.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                technicals[f"{ticker}_RSI"] = round(rsi.iloc[-1], 2)
-                
-                # --- CALCULATE SMA (Moving Averages) ---
-                technicals[f"{ticker}_SMA50"] = round(series.rolling(window=50).mean().iloc[-1], 2)
-                technicals[f"{ticker}_SMA200"] = round(series.rolling(window=200).mean().iloc[-1], 2)
-
             else:
                 changes[ticker] = 0.0
         except:
             changes[ticker] = 0.0
 
+    # RSI-14 and SMAs on daily, weekly and monthly bars for every ticker
+    technicals = indicator_cache().update(close_data).snapshot()
+
     return changes, last_prices, technicals, close_data
 
+# --- PROFILING (?profile=1 or NIFTY_PROFILE=1) ---
+# Re-fetches the download and scrape so they show up in the profile
+profiler = start_profiler_if_requested("master", clear=(get_market_data, scrape_gift_nifty))
+
 # --- PAGE 1: LIVE DASHBOARD ---
 if page == "Live Dashboard":
     st.title("🚀 Nifty Master 4.0")
@@ -100,6 +126,8 @@ if page == "Live Dashboard":
     # Logic
     gap_points = manual_gift - nifty_last
     vix = prices.get("^INDIAVIX", 0)
+    # What the overnight cues alone say the gap should be
+    model_pct = gap_model().predict_live()
     
     # --- VERDICT ENGINE 4.0 ---
     sentiment = "NEUTRAL"
@@ -154,6 +182,17 @@ if page == "Live Dashboard":
     c5.metric("HDFC Bank ADR", f"${prices.get('HDB',0)}", f"{changes.get('HDB',0)}%")
     c6.metric("Nifty Last Close", f"{nifty_last}", f"{changes.get('^NSEI',0)}%")
 
+    # GIFT vs Model
+    g1, g2 = st.columns(2)
+    g1.metric("GIFT-Implied Gap", f"{int(gap_points)} pts", f"{round(gap_points / nifty_last * 100, 2)}%")
+    if model_pct is not None:
+        model_points = model_pct / 100 * nifty_last
+        g2.metric("Model-Predicted Gap", f"{int(model_points)} pts", f"{round(model_pct, 2)}%")
+        g2.caption(f"From overnight cues + VIX, learned over {gap_model().sessions} sessions "
+                   f"(typical error ±{gap_model().rmse():.2f}%).")
+    else:
+        g2.metric("Model-Predicted Gap", "N/A")
+
 # --- PAGE 2: TECHNICAL HEALTH (NEW) ---
 elif page == "Technical Health 🛠️":
     st.title("🛠️ Nifty Internal Health")
@@ -191,8 +230,33 @@ elif page == "Technical Health 🛠️":
             
         # Chart
         st.subheader("3. 1-Year Trend Chart")
-        if "^NSEI" in history:
-            st.line_chart(history["^NSEI"])
+        if "^NSEI" in history and len(history):
+            st.line_chart(history["^NSEI"].loc[history.index[-1] - pd.DateOffset(years=1):])
+
+        st.divider()
+        
+        # Cue Correlations
+        st.subheader("4. Which Cues Move the Opening Gap?")
+        st.caption("Correlation of each overnight cue with the next Nifty opening gap, over the last 20 / 60 / 120 sessions.")
+        corr = cue_stats().correlation()
+        heat = corr.reset_index().melt(id_vars="Cue", var_name="Window", value_name="Correlation")
+        st.altair_chart(
+            alt.Chart(heat).mark_rect().encode(
+                x=alt.X("Window:N", sort=list(corr.columns)),
+                y=alt.Y("Cue:N", sort=list(corr.index)),
+                color=alt.Color("Correlation:Q", scale=alt.Scale(scheme="redblue", domain=[-1, 1])),
+                tooltip=["Cue", "Window", alt.Tooltip("Correlation:Q", format=".2f")],
+            )
+        )
+        st.write("**Beta** (Nifty gap % per 1% move in the cue):")
+        st.dataframe(cue_stats().beta().round(3))
+
+        st.divider()
+        
+        # Multi-Timeframe Table
+        st.subheader("5. Daily / Weekly / Monthly View")
+        st.caption("RSI-14 plus short and long moving averages on each timeframe (D: 50/200, W: 10/40, M: 3/10).")
+        st.dataframe(indicator_cache().table(list(prices)).round(2))
 
 # --- PAGE 3: LOGIC ---
 elif page == "Logic & Explanation":
@@ -211,4 +275,18 @@ elif page == "Logic & Explanation":
     * The most important line for big investors.
     * If Nifty is **above** this line, buy-on-dip works.
     * If **below**, sell-on-rise works.
-    """)
\ No newline at end of file
+    
+    **4. Weekly & Monthly Timeframes**
+    * The same RSI and moving averages on weekly and monthly bars.
+    * When daily, weekly and monthly all agree, the trend is stronger.
+    
+    **5. Cue Correlations**
+    * How closely each US cue has tracked the next morning's Nifty gap lately.
+    * A cue with high correlation deserves more weight than its fixed threshold suggests.
+    
+    **6. Model-Predicted Gap**
+    * A regression of the opening gap on the overnight cues and India VIX, updated every session.
+    * If it disagrees with GIFT Nifty by a lot, one of them is missing something.
+    """)
+
+finish_profiler(profiler)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""On-demand profiler for one full script rerun.
+
+Turn it on with `?profile=1` in the app URL, which profiles the next rerun
+only (the parameter is removed once profiling starts), or NIFTY_PROFILE=1 in
+the environment, which profiles every rerun of every session and re-fetches
+the profiled cached functions each time. The rerun is traced with sys.setprofile (deterministic, every
+Python and C call) and tracemalloc, and two files land in NIFTY_PROFILE_DIR
+(default "profiles"):
+
+    rerun-<time>-<name>-<pid>-<n>.speedscope.json   open at https://www.speedscope.app
+    rerun-<time>-<name>-<pid>-<n>.alloc.txt         peak memory + top allocation sites
+
+When the mode is off the only cost is one env lookup and one query-param read.
+Work yfinance does on its own download threads is not traced; the script
+thread waiting on it is. tracemalloc is process-wide, so when profiled reruns
+overlap the memory figures include each other's allocations.
+"""
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+
+import streamlit as st
+
+TRUTHY = {"1", "true", "yes", "on"}
+_lock = threading.Lock()
+_active = {}        # thread -> its running profiler. Streamlit runs each rerun on a new thread
+_tracing_users = 0  # running profilers that need tracemalloc
+_started_tracemalloc = False
+_file_counter = itertools.count()
+
+
+def _acquire_tracemalloc():
+    global _tracing_users, _started_tracemalloc
+    with _lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        _tracing_users += 1
+
+
+def _release_tracemalloc():
+    # Only the last profiler out stops tracemalloc, and only if we started it
+    global _tracing_users, _started_tracemalloc
+    with _lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+def profile_requested():
+    if os.environ.get("NIFTY_PROFILE", "").lower() in TRUTHY:
+        return True
+    if st.query_params.get("profile", "").lower() in TRUTHY:
+        # One-shot: later reruns of this session (sidebar clicks, inputs) run unprofiled
+        del st.query_params["profile"]
+        return True
+    return False
+
+
+class RerunProfiler:
+    """Records call open/close events for speedscope's "evented" format."""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = []
+        self.frame_ids = {}
+        # Flat int arrays keep the tracer's own allocations out of the way:
+        # frame id for an open event, ~frame id for a close, and its timestamp
+        self.event_frames = array("q")
+        self.event_times = array("q")
+        self.stack = []
+
+    def _frame_id(self, key, name, file, line):
+        fid = self.frame_ids.get(key)
+        if fid is None:
+            fid = self.frame_ids[key] = len(self.frames)
+            self.frames.append({"name": name, "file": file, "line": line})
+        return fid
+
+    def _trace(self, frame, event, arg):
+        now = time.perf_counter_ns() - self.t0
+        if event == "call":
+            code = frame.f_code
+            fid = self._frame_id(code, getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+        elif event == "c_call":
+            # Bound builtins are new objects on every call, so key them by name
+            module = getattr(arg, "__module__", None) or type(getattr(arg, "__self__", None)).__name__
+            name = f"{module}.{getattr(arg, '__qualname__', arg.__name__)}"
+            fid = self._frame_id(name, name, "<built-in>", 0)
+        elif self.stack:
+            # return / c_return / c_exception of something we saw open
+            self.event_frames.append(~self.stack.pop())
+            self.event_times.append(now)
+            return
+        else:
+            return  # unwinding out of frames that were already running at start()
+        self.stack.append(fid)
+        self.event_frames.append(fid)
+        self.event_times.append(now)
+
+    def start(self):
+        _acquire_tracemalloc()
+        tracemalloc.reset_peak()
+        self.thread = threading.current_thread()
+        with _lock:
+            _active[self.thread] = self
+        self.t0 = time.perf_counter_ns()
+        sys.setprofile(self._trace)
+        return self
+
+    def _detach(self):
+        # Returns False if someone else already detached this profiler
+        with _lock:
+            if _active.get(self.thread) is not self:
+                return False
+            del _active[self.thread]
+        return True
+
+    def abandon(self):
+        if threading.current_thread() is self.thread:
+            sys.setprofile(None)
+        if self._detach():
+            _release_tracemalloc()
+
+    def stop(self, directory=None):
+        """Stop tracing and write the profile files. Returns their paths."""
+        sys.setprofile(None)
+        end = time.perf_counter_ns() - self.t0
+        while self.stack:
+            self.event_frames.append(~self.stack.pop())
+            self.event_times.append(end)
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+        current, peak = tracemalloc.get_traced_memory()
+        if self._detach():
+            _release_tracemalloc()
+
+        directory = directory or os.environ.get("NIFTY_PROFILE_DIR", "profiles")
+        os.makedirs(directory, exist_ok=True)
+        # Several profiles can land in the same second (concurrent sessions, NIFTY_PROFILE=1)
+        stamp = f"{datetime.now():%Y%m%d-%H%M%S}-{self.name}-{os.getpid()}-{next(_file_counter)}"
+        stem = os.path.join(directory, f"rerun-{stamp}")
+
+        events = [{"type": "O", "frame": fid, "at": at} if fid >= 0 else {"type": "C", "frame": ~fid, "at": at}
+                  for fid, at in zip(self.event_frames, self.event_times)]
+        with open(stem + ".speedscope.json", "w") as f:
+            json.dump({
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": self.frames},
+                "profiles": [{
+                    "type": "evented", "name": self.name, "unit": "nanoseconds",
+                    "startValue": 0, "endValue": end, "events": events,
+                }],
+                "name": self.name,
+                "exporter": "nifty profiling.py",
+            }, f)
+
+        with open(stem + ".alloc.txt", "w") as f:
+            f.write(f"rerun wall time: {end / 1e6:.1f} ms\n")
+            f.write(f"traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB "
+                    f"(incl. {len(self.event_frames) * 16 / 1024:.1f} KiB of profiler events)\n\n")
+            f.write("top allocation sites (still live at end of rerun):\n")
+            for stat in snapshot.statistics("lineno")[:40]:
+                f.write(f"{stat}\n")
+        return [stem + ".speedscope.json", stem + ".alloc.txt"]
+
+
+def start_profiler_if_requested(name, clear=()):
+    """Call near the top of the script. Returns a running profiler, or None when off.
+
+    `clear` are the st.cache_data functions whose work should show up in the
+    profile; only their caches are dropped, not every session's.
+    """
+    with _lock:
+        # Reruns that died (exception / st.stop) before reaching finish_profiler()
+        lingering = [p for thread, p in _active.items() if not thread.is_alive()]
+    for profiler in lingering:
+        profiler.abandon()
+    if not profile_requested():
+        return None
+    for cached in clear:
+        cached.clear()
+    return RerunProfiler(name).start()
+
+
+def finish_profiler(profiler):
+    """Call at the bottom of the script with whatever start_profiler_if_requested returned."""
+    if profiler is None:
+        return
+    paths = profiler.stop()
+    st.sidebar.caption("Profile saved: " + ", ".join(paths))
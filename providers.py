@@ -0,0 +1,219 @@
+"""Market-data providers shared by the Nifty apps.
+
+Every app fetches prices through `get_provider().download(...)` and scrapes
+through `get_provider().get_page(...)`, so the backend can be switched without
+touching the app code:
+
+    NIFTY_DATA_PROVIDER=live        yfinance + requests (default)
+    NIFTY_DATA_PROVIDER=record      live, and save every response to NIFTY_DATA_DIR
+    NIFTY_DATA_PROVIDER=replay      serve the responses saved by `record`, no network
+    NIFTY_DATA_PROVIDER=synthetic   random-walk series, no network
+
+Synthetic knobs: NIFTY_SYNTHETIC_TICKERS (extra tickers added to every app's
+universe, e.g. 10000), NIFTY_SYNTHETIC_PERIOD (replaces the period every app
+asks for, e.g. 20y), NIFTY_SYNTHETIC_SEED, NIFTY_SYNTHETIC_END (YYYY-MM-DD).
+"""
+import hashlib
+import json
+import os
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+
+NSE_TICKERS = {"^NSEI", "^INDIAVIX", "^NSEBANK"}
+TRADING_DAYS_PER_YEAR = 252
+
+
+# --- LIVE ---
+class LiveProvider:
+    """Straight pass-through to Yahoo Finance and the web."""
+
+    def tickers(self, tickers):
+        return list(tickers)
+
+    def download(self, tickers, period):
+        return yf.download(tickers, period=period, progress=False)
+
+    def get_page(self, url, headers=None, timeout=5):
+        # Returns the page HTML, or None for a non-200 answer
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            return response.text
+        return None
+
+
+# --- RECORD / REPLAY ---
+def _download_key(tickers, period):
+    raw = json.dumps([sorted(tickers), period])
+    return "download-" + hashlib.sha1(raw.encode()).hexdigest()[:12] + ".pkl"
+
+
+def _page_key(url):
+    return "page-" + hashlib.sha1(url.encode()).hexdigest()[:12] + ".html"
+
+
+class RecordingProvider(LiveProvider):
+    """Live provider that also saves every response for later replay."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def download(self, tickers, period):
+        data = super().download(tickers, period)
+        data.to_pickle(os.path.join(self.directory, _download_key(tickers, period)))
+        return data
+
+    def get_page(self, url, headers=None, timeout=5):
+        html = super().get_page(url, headers=headers, timeout=timeout)
+        if html is not None:
+            with open(os.path.join(self.directory, _page_key(url)), "w", encoding="utf-8") as f:
+                f.write(html)
+        return html
+
+
+class ReplayProvider:
+    """Serves responses saved by RecordingProvider. Never touches the network."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def tickers(self, tickers):
+        return list(tickers)
+
+    def download(self, tickers, period):
+        path = os.path.join(self.directory, _download_key(tickers, period))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No recording for {sorted(tickers)} / {period} in {self.directory}. "
+                                    "Run once with NIFTY_DATA_PROVIDER=record.")
+        return pd.read_pickle(path)
+
+    def get_page(self, url, headers=None, timeout=5):
+        # A page that was never recorded behaves like a failed scrape
+        path = os.path.join(self.directory, _page_key(url))
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+
+# --- SYNTHETIC ---
+BASE_PRICES = {
+    "INDA": 52.0, "EWW": 55.0, "HDB": 62.0, "IBN": 29.0, "INFY": 19.0,
+    "^NSEI": 24000.0, "CL=F": 78.0, "^TNX": 4.2, "^INDIAVIX": 13.5,
+    "DX-Y.NYB": 104.0, "QQQ": 450.0,
+}
+
+
+def period_to_days(period):
+    """Trading days covered by a yfinance period string ("5d", "1mo", "1y", "20y", ...)."""
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return 10 * TRADING_DAYS_PER_YEAR  # "max", "ytd" and friends
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return n
+    return max(1, round(n * {"wk": 5, "mo": 21, "y": TRADING_DAYS_PER_YEAR}[unit]))
+
+
+class SyntheticProvider:
+    """Random-walk Open/Close series for any number of tickers and any period.
+
+    Each ticker's walk is seeded from its name, so the same ticker gives the
+    same series no matter which universe it is downloaded with. NSE and US
+    tickers skip different ~2% of weekdays so the two calendars don't line up.
+    Only Open and Close are generated, straight into one array of the final
+    size (10k tickers x 20y is ~0.8 GB of float64); the apps never read
+    High/Low/Volume. `period`, if set, replaces whatever period the app asks for.
+    """
+
+    def __init__(self, extra_tickers=0, seed=0, end=None, period=None):
+        self.extra_tickers = extra_tickers
+        self.seed = seed
+        self.period = period
+        self.end = pd.Timestamp(end) if end else pd.Timestamp.today().normalize()
+
+    def tickers(self, tickers):
+        return list(tickers) + [f"SYN{i:05d}" for i in range(self.extra_tickers)]
+
+    def _dates(self, period):
+        days = period_to_days(period)
+        # Pad so the calendar holidays removed below still leave `days` sessions
+        return pd.bdate_range(end=self.end, periods=int(days * 1.03) + 2)
+
+    # Random draws run backwards from `end`, so a shorter period is an exact
+    # suffix of a longer one and every period agrees on the latest close.
+    def _calendar_mask(self, n_days, exchange):
+        rng = np.random.default_rng([self.seed, zlib.crc32(exchange.encode())])
+        mask = rng.random(n_days) > 0.02
+        mask[0] = True
+        return mask[::-1]
+
+    def download(self, tickers, period):
+        return self._generate(tickers, self.period or period)
+
+    def _generate(self, tickers, period):
+        dates = self._dates(period)
+        n_days, n_tickers = len(dates), len(tickers)
+        is_nse = np.array([t in NSE_TICKERS or t.endswith(".NS") for t in tickers], dtype=bool)
+        calendars = [(self._calendar_mask(n_days, exchange), cols)
+                     for exchange, cols in (("NSE", is_nse), ("US", ~is_nse)) if cols.any()]
+
+        # Keep the last `period` days on which anything traded (drops the padding)
+        traded = np.logical_or.reduce([mask for mask, _ in calendars]) if calendars else np.ones(n_days, dtype=bool)
+        rows = np.flatnonzero(traded)[-period_to_days(period):]
+
+        values = np.empty((len(rows), 2 * n_tickers))
+        close, open_ = values[:, :n_tickers], values[:, n_tickers:]
+        for j, ticker in enumerate(tickers):
+            key = zlib.crc32(ticker.encode())
+            sigma = 0.025 if ticker == "^INDIAVIX" else 0.01
+            base = BASE_PRICES.get(ticker, 20 + 480 * np.random.default_rng([self.seed, key, 2]).random())
+            walk = np.random.default_rng([self.seed, key, 0]).standard_normal(n_days) * sigma
+            series = base * np.exp(np.cumsum(walk))[::-1]
+            gaps = np.random.default_rng([self.seed, key, 1]).standard_normal(n_days)[::-1] * sigma * 0.4
+            close[:, j] = series[rows]
+            open_[:, j] = series[rows] * np.exp(gaps[rows])
+
+        for mask, cols in calendars:
+            closed = ~mask[rows]
+            close[np.ix_(closed, cols)] = np.nan
+            open_[np.ix_(closed, cols)] = np.nan
+
+        columns = pd.MultiIndex.from_product([["Close", "Open"], tickers], names=["Price", "Ticker"])
+        return pd.DataFrame(values, index=dates[rows].rename("Date"), columns=columns, copy=False)
+
+    def get_page(self, url, headers=None, timeout=5):
+        # Just enough of moneycontrol's global-indices table for the scrapers
+        nifty = self._generate(["^NSEI"], "5d")["Close"]["^NSEI"].dropna().iloc[-1]
+        gift = nifty * 1.002
+        return f"""<html><body><table>
+<tr><th>Name</th><th>Price</th><th>Change</th></tr>
+<tr><td>GIFT Nifty</td><td>{gift:,.2f}</td><td>0.20</td></tr>
+</table></body></html>"""
+
+
+# --- SELECTION ---
+@lru_cache(maxsize=None)
+def get_provider():
+    name = os.environ.get("NIFTY_DATA_PROVIDER", "live").lower()
+    directory = os.environ.get("NIFTY_DATA_DIR", "recordings")
+    if name == "live":
+        return LiveProvider()
+    if name == "record":
+        return RecordingProvider(directory)
+    if name == "replay":
+        return ReplayProvider(directory)
+    if name == "synthetic":
+        return SyntheticProvider(
+            extra_tickers=int(os.environ.get("NIFTY_SYNTHETIC_TICKERS", "0")),
+            seed=int(os.environ.get("NIFTY_SYNTHETIC_SEED", "0")),
+            end=os.environ.get("NIFTY_SYNTHETIC_END") or None,
+            period=os.environ.get("NIFTY_SYNTHETIC_PERIOD") or None,
+        )
+    raise ValueError(f"Unknown NIFTY_DATA_PROVIDER {name!r} (expected live, record, replay or synthetic)")
@@ -0,0 +1,53 @@
+"""RollingCueStats: running sums must agree with pandas rolling corr / cov."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from alignment import SessionAlignment
+from correlation import RollingCueStats
+from providers import SyntheticProvider
+
+CUES = ["INDA", "EWW", "HDB", "IBN", "INFY", "CL=F", "^TNX"]
+WINDOWS = (20, 60, 120)
+
+
+@pytest.fixture
+def data():
+    return SyntheticProvider(end="2026-06-30").download(CUES + ["^NSEI"], "2y")
+
+
+def pandas_reference(data):
+    alignment = SessionAlignment().update(data["Close"])
+    opens = np.arange(1, len(alignment.nse_dates))
+    x = pd.DataFrame(alignment.cue_returns(CUES, opens), columns=CUES)
+    y = pd.Series(alignment.gaps(data["Open"]["^NSEI"], opens))
+    corr, beta = {}, {}
+    for w in WINDOWS:
+        min_periods = max(5, w // 2)
+        corr[f"{w}d"] = [x[c].rolling(w, min_periods=min_periods).corr(y).iloc[-1] for c in CUES]
+        # cov / var over the pairs where both sides exist
+        beta[f"{w}d"] = [x[c].rolling(w, min_periods=min_periods).cov(y).iloc[-1]
+                         / x[c].where(y.notna()).rolling(w, min_periods=min_periods).var().iloc[-1] for c in CUES]
+    index = pd.Index(CUES, name="Cue")
+    return pd.DataFrame(corr, index=index), pd.DataFrame(beta, index=index)
+
+
+def test_matches_pandas_rolling(data):
+    alignment = SessionAlignment().update(data["Close"])
+    stats = RollingCueStats(CUES, WINDOWS).update(alignment, data["Open"]["^NSEI"])
+    corr, beta = pandas_reference(data)
+    pd.testing.assert_frame_equal(stats.correlation(), corr, rtol=0, atol=1e-12)
+    pd.testing.assert_frame_equal(stats.beta(), beta, rtol=0, atol=1e-12)
+
+
+def test_split_updates_match_one_pass(data):
+    full_alignment = SessionAlignment().update(data["Close"])
+    full = RollingCueStats(CUES, WINDOWS).update(full_alignment, data["Open"]["^NSEI"])
+
+    alignment = SessionAlignment()
+    stats = RollingCueStats(CUES, WINDOWS)
+    for end in (150, 300, 301, len(data)):
+        alignment.update(data["Close"].iloc[:end])
+        stats.update(alignment, data["Open"]["^NSEI"])
+    pd.testing.assert_frame_equal(stats.correlation(), full.correlation())
+    pd.testing.assert_frame_equal(stats.beta(), full.beta())
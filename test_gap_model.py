@@ -0,0 +1,54 @@
+"""GapModel: recursive least squares must equal the batch solve it replaces."""
+import numpy as np
+import pytest
+
+from alignment import SessionAlignment
+from gap_model import GapModel
+from providers import SyntheticProvider
+
+CUES = ["INDA", "HDB", "IBN", "INFY", "EWW", "CL=F", "^TNX"]
+
+
+@pytest.fixture
+def data():
+    return SyntheticProvider(end="2026-06-30").download(CUES + ["^NSEI", "^INDIAVIX"], "2y")
+
+
+def test_matches_batch_weighted_least_squares(data):
+    alignment = SessionAlignment().update(data["Close"])
+    model = GapModel(CUES).update(alignment, data["Open"]["^NSEI"])
+
+    opens = np.arange(1, alignment.live_open())
+    X = model.features_at(alignment, opens)
+    y = alignment.gaps(data["Open"]["^NSEI"], opens)
+    ok = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    X, y = X[ok], y[ok]
+    assert model.sessions == len(y)
+
+    # RLS from P0 = prior * I with forgetting lam minimises
+    # sum lam^(T-t) (y_t - x_t w)^2 + lam^T / prior * |w|^2
+    lam, T = model.forgetting, len(y)
+    weights = lam ** np.arange(T)[::-1]
+    A = (X * weights[:, None]).T @ X + lam ** T / 100.0 * np.eye(X.shape[1])
+    b = (X * weights[:, None]).T @ y
+    np.testing.assert_allclose(model.weights, np.linalg.solve(A, b), rtol=0, atol=1e-9)
+
+
+def test_split_history_matches_one_pass(data):
+    full = GapModel(CUES).update(SessionAlignment().update(data["Close"]), data["Open"]["^NSEI"])
+
+    alignment = SessionAlignment()
+    model = GapModel(CUES)
+    for end in (200, 350, 351, len(data)):
+        alignment.update(data["Close"].iloc[:end])
+        model.update(alignment, data["Open"]["^NSEI"])
+    assert model.sessions == full.sessions
+    np.testing.assert_array_equal(model.weights, full.weights)
+    assert model.predict_live() == full.predict_live()
+
+
+def test_live_prediction_is_the_live_feature_row(data):
+    alignment = SessionAlignment().update(data["Close"])
+    model = GapModel(CUES).update(alignment, data["Open"]["^NSEI"])
+    x = np.nan_to_num(model.features_at(alignment, [alignment.live_open()])[0])
+    assert model.predict_live() == pytest.approx(float(x @ model.weights))
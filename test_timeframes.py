@@ -0,0 +1,73 @@
+"""IndicatorCache: incremental updates must match a fresh build."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from providers import SyntheticProvider
+from timeframes import IndicatorCache, TIMEFRAMES
+
+TICKERS = ["INDA", "HDB", "^NSEI", "CL=F", "^INDIAVIX"]
+
+
+@pytest.fixture
+def closes():
+    data = SyntheticProvider(end="2026-06-30").download(TICKERS, "2y")
+    return data["Close"]
+
+
+def assert_same_as_fresh(cache, close_data):
+    fresh = IndicatorCache().update(close_data)
+    assert cache.snapshot() == fresh.snapshot()
+    for tf in TIMEFRAMES:
+        for ticker in TICKERS:
+            pd.testing.assert_frame_equal(cache.indicators(tf, ticker), fresh.indicators(tf, ticker))
+
+
+def test_new_bar_and_moving_live_bar(closes):
+    cache = IndicatorCache().update(closes.iloc[:-3])
+    cache.update(closes.iloc[:-1])
+    assert_same_as_fresh(cache, closes.iloc[:-1])
+
+    live = closes.copy()
+    live.iloc[-1] *= 1.01
+    cache.update(live)
+    assert_same_as_fresh(cache, live)
+
+
+def test_unchanged_data_is_a_no_op(closes):
+    cache = IndicatorCache().update(closes)
+    snapshot = cache.snapshot()
+    cache.update(closes.copy())
+    assert cache.snapshot() is snapshot
+
+
+def test_revised_history_is_picked_up(closes):
+    # Adjusted closes: an ex-dividend date rescales everything before it
+    cache = IndicatorCache().update(closes)
+    revised = closes.copy()
+    revised.iloc[:-20, revised.columns.get_loc("INDA")] *= 0.9
+    cache.update(revised)
+    assert_same_as_fresh(cache, revised)
+    assert cache.snapshot()["INDA_SMA50"] == pytest.approx(revised["INDA"].dropna().iloc[-50:].mean(), abs=0.01)
+
+
+def test_rolling_window_with_revision(closes):
+    # Next day's download: the window slides forward one bar and history is revised
+    cache = IndicatorCache().update(closes.iloc[:-1])
+    revised = closes.iloc[1:].copy()
+    revised.iloc[:100, revised.columns.get_loc("HDB")] *= 0.95
+    cache.update(revised)
+    fresh = IndicatorCache().update(pd.concat([closes.iloc[:1], revised]))
+    assert cache.snapshot() == fresh.snapshot()
+    np.testing.assert_array_equal(cache.table().values, fresh.table().values)
+
+
+def test_empty_download_keeps_the_store(closes):
+    # yfinance answers with zero rows when every ticker fails
+    empty = closes.iloc[:0]
+    assert IndicatorCache().update(empty).snapshot() == {}
+    assert IndicatorCache().update(empty).table(TICKERS).empty
+
+    cache = IndicatorCache().update(closes)
+    snapshot = cache.snapshot()
+    assert cache.update(empty).snapshot() is snapshot
@@ -0,0 +1,244 @@
+"""Daily / weekly / monthly RSI and SMAs for every ticker from one daily bar store.
+
+Weekly and monthly bars are resampled from the daily closes once and kept per
+timeframe together with their indicators. When a new daily bar arrives (or
+today's live bar moves) only the buckets it falls into are rebuilt and only
+the indicator rows for those buckets are recomputed, from a tail just long
+enough for the longest window. A revision to earlier history (adjusted closes
+after a dividend) rebuilds from the first bar that differs. Adding timeframes
+costs no extra downloads.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# timeframe -> (pandas period freq, key prefix, SMA windows). The weekly and
+# monthly SMAs span roughly the same time as the daily 50/200.
+TIMEFRAMES = {
+    "D": ("D", "", (50, 200)),
+    "W": ("W-FRI", "W_", (10, 40)),
+    "M": ("M", "M_", (3, 10)),
+}
+RSI_WINDOW = 14
+
+
+def indicator_tail(values, stale, sma_windows):
+    """RSI-14 and SMAs for the last `stale` rows of gap-free closes.
+
+    `values` is (n,) or (n, tickers). Same numbers as the dashboard's original
+    pandas code (simple-average gains and losses, first delta counted as 0) but
+    from prefix sums, so the trailing rows only need the last `stale + window`
+    closes. Returns (stale, 1 + len(sma_windows)) or (stale, tickers, ...).
+    """
+    v = np.asarray(values, dtype=float)
+    flat = v.ndim == 1
+    v = v.reshape(len(v), -1)
+    n = len(v)
+    delta = np.zeros_like(v)
+    delta[1:] = np.diff(v, axis=0)
+    zero = np.zeros((1, v.shape[1]))
+    cum_gain = np.concatenate([zero, np.cumsum(np.maximum(delta, 0), axis=0)])
+    cum_loss = np.concatenate([zero, np.cumsum(np.maximum(-delta, 0), axis=0)])
+    cum_close = np.concatenate([zero, np.cumsum(v, axis=0)])
+    pos = np.arange(n - stale, n)
+
+    out = np.full((stale, v.shape[1], 1 + len(sma_windows)), np.nan)
+    ok = pos >= RSI_WINDOW - 1
+    p = pos[ok]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = (cum_gain[p + 1] - cum_gain[p + 1 - RSI_WINDOW]) / (cum_loss[p + 1] - cum_loss[p + 1 - RSI_WINDOW])
+        out[ok, :, 0] = 100 - (100 / (1 + rs))
+    for k, w in enumerate(sma_windows, start=1):
+        ok = pos >= w - 1
+        p = pos[ok]
+        out[ok, :, k] = (cum_close[p + 1] - cum_close[p + 1 - w]) / w
+    return out[:, 0, :] if flat else out
+
+
+class _Rows:
+    """Growable array: replacing the last few rows costs those rows, not a full copy."""
+
+    def __init__(self, block):
+        self.buf = np.array(block)
+        self.n = len(self.buf)
+
+    @property
+    def values(self):
+        return self.buf[:self.n]
+
+    def replace_tail(self, start, block):
+        end = start + len(block)
+        if end > len(self.buf):
+            grown = np.empty((max(end, 2 * len(self.buf)),) + self.buf.shape[1:], dtype=self.buf.dtype)
+            grown[:start] = self.buf[:start]
+            self.buf = grown
+        self.buf[start:end] = block
+        self.n = end
+
+
+class IndicatorCache:
+    def __init__(self, timeframes=TIMEFRAMES):
+        self.timeframes = timeframes
+        self.tickers = None
+        self._dates = None     # daily dates (int64 ns)
+        self._daily = None     # daily closes, dates x tickers
+        self._buckets = {}     # tf -> bucket (period ordinal) of every daily row
+        self._bar_ids = {}     # tf -> period ordinal of every bar
+        self._bars = {}        # tf -> bar closes, bars x tickers
+        self._values = {}      # tf -> indicators, bars x tickers x [RSI, SMAs...]
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    # --- UPDATE ---
+    def update(self, close_data):
+        """Fold a (dates x tickers) close frame into the store. Unchanged data costs one pass over the overlap."""
+        if close_data.empty:
+            return self  # every ticker failed: keep the last good store
+        with self._lock:
+            close_data = close_data.sort_index()
+            dates = close_data.index.values.astype("datetime64[ns]").view("int64")
+            if (self.tickers is None or set(close_data.columns) != set(self.tickers)
+                    or dates[0] < self._dates.values[0]):
+                self.tickers = list(close_data.columns)
+                start, block_dates, block = 0, dates, close_data.values.astype(float)
+            else:
+                values = close_data[self.tickers].values.astype(float)
+                changed = self._first_changed(dates, values)
+                if changed is None:
+                    return self
+                start, i = changed
+                block_dates, block = dates[i:], values[i:]
+
+            if start == 0:
+                self._dates, self._daily = _Rows(block_dates), _Rows(block)
+            else:
+                self._dates.replace_tail(start, block_dates)
+                self._daily.replace_tail(start, block)
+            for tf in self.timeframes:
+                self._refresh(tf, start)
+            self._snapshot = None
+        return self
+
+    def _first_changed(self, dates, values):
+        """(row in our store, row in the incoming data) where they start to differ, or None.
+
+        The whole overlap is compared, not just the last bar: adjusted closes
+        rescale all earlier history on every ex-dividend date.
+        """
+        held = self._dates.n
+        s0 = np.searchsorted(self._dates.values, dates[0])
+        m = min(held - s0, len(dates))
+        same = self._dates.values[s0:s0 + m] == dates[:m]
+        same &= ((self._daily.values[s0:s0 + m] == values[:m])
+                 | (np.isnan(self._daily.values[s0:s0 + m]) & np.isnan(values[:m]))).all(axis=1)
+        diff = np.flatnonzero(~same)
+        if len(diff):
+            return s0 + diff[0], diff[0]
+        if held - s0 > len(dates):
+            return 0, 0  # bars we hold have vanished from the feed: start over
+        if m == len(dates):
+            return None
+        return held, m
+
+    def _refresh(self, tf, start):
+        freq, _, sma_windows = self.timeframes[tf]
+        new_dates = pd.DatetimeIndex(self._dates.values[start:])
+        ordinals = new_dates.to_period(freq).asi8
+        if start == 0:
+            self._buckets[tf] = _Rows(ordinals)
+        else:
+            self._buckets[tf].replace_tail(start, ordinals)
+
+        # Only the bucket holding the first changed day and anything after it is stale
+        first = ordinals[0]
+        buckets = self._buckets[tf].values
+        row = np.searchsorted(buckets, first)
+        tail = pd.DataFrame(self._daily.values[row:]).groupby(buckets[row:]).last()
+        if start == 0:
+            self._bar_ids[tf], self._bars[tf] = _Rows(tail.index.values), _Rows(tail.values)
+            bar = 0
+        else:
+            bar = np.searchsorted(self._bar_ids[tf].values, first)
+            self._bar_ids[tf].replace_tail(bar, tail.index.values)
+            self._bars[tf].replace_tail(bar, tail.values)
+
+        rows = self._stale_indicators(self._bars[tf].values, bar, sma_windows)
+        if start == 0:
+            self._values[tf] = _Rows(rows)
+        else:
+            self._values[tf].replace_tail(bar, rows)
+
+    @staticmethod
+    def _stale_indicators(bars, bar, sma_windows):
+        need = max(RSI_WINDOW + 1, *sma_windows)
+        stale = len(bars) - bar
+        out = np.full((stale, bars.shape[1], 1 + len(sma_windows)), np.nan)
+
+        # Tickers with no missing bars in the lookback: all at once
+        block = bars[max(0, bar - need):]
+        gap_free = ~np.isnan(block).any(axis=0)
+        if gap_free.any():
+            out[:, gap_free] = indicator_tail(block[:, gap_free], stale, sma_windows)
+
+        # The rest (holidays on their own calendar) one by one on their valid bars
+        for j in np.flatnonzero(~gap_free):
+            lo = max(0, bar - 4 * need)
+            valid = lo + np.flatnonzero(~np.isnan(bars[lo:, j]))
+            fresh = valid[valid >= bar]
+            if not len(fresh):
+                continue
+            if lo and len(valid) < len(fresh) + need:
+                valid = np.flatnonzero(~np.isnan(bars[:, j]))
+            take = valid[-(len(fresh) + need):]
+            out[fresh - bar, j] = indicator_tail(bars[take, j], len(fresh), sma_windows)
+        return out
+
+    # --- READ ---
+    def _latest(self, tf):
+        """Indicator values at each ticker's last bar: tickers x [RSI, SMAs...]. Call under the lock."""
+        bars = self._bars[tf].values
+        valid = ~np.isnan(bars)
+        last = len(bars) - 1 - np.argmax(valid[::-1], axis=0)
+        latest = self._values[tf].values[last, np.arange(len(self.tickers))]
+        latest[~valid.any(axis=0)] = np.nan
+        return latest
+
+    def _names(self, tf):
+        return ["RSI"] + [f"SMA{w}" for w in self.timeframes[tf][2]]
+
+    def indicators(self, tf, ticker):
+        """Full indicator history of one ticker on one timeframe."""
+        with self._lock:
+            j = self.tickers.index(ticker)
+            valid = ~np.isnan(self._bars[tf].values[:, j])
+            ids, values = self._bar_ids[tf].values[valid], self._values[tf].values[valid, j]
+        index = pd.PeriodIndex(pd.arrays.PeriodArray(ids, dtype=pd.PeriodDtype(self.timeframes[tf][0])))
+        return pd.DataFrame(values, index=index, columns=self._names(tf))
+
+    def snapshot(self):
+        """Latest value of every indicator: {"INDA_RSI", "INDA_SMA50", "INDA_W_RSI", "INDA_M_SMA10", ...}."""
+        # Reads take the lock too: update() grows _bars before _values
+        with self._lock:
+            if self.tickers is None:
+                return {}
+            if self._snapshot is None:
+                snap = {}
+                for tf, (_, prefix, _) in self.timeframes.items():
+                    latest = self._latest(tf)
+                    for j, ticker in enumerate(self.tickers):
+                        for k, name in enumerate(self._names(tf)):
+                            if not np.isnan(latest[j, k]):  # too little history: leave it out
+                                snap[f"{ticker}_{prefix}{name}"] = round(float(latest[j, k]), 2)
+                self._snapshot = snap
+            return self._snapshot
+
+    def table(self, tickers=None):
+        """tickers x (timeframe, indicator) frame of latest values, for display."""
+        with self._lock:
+            if self.tickers is None:
+                return pd.DataFrame(index=tickers)
+            frames = {tf: pd.DataFrame(self._latest(tf), index=self.tickers, columns=self._names(tf))
+                      for tf in self.timeframes}
+        table = pd.concat(frames, axis=1)
+        return table.reindex(tickers) if tickers is not None else table